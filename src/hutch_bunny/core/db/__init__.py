@@ -143,6 +143,19 @@ def _create_snowflake_client() -> SnowflakeDBClient:
     )
 
 
+def _check_statement_cache(db_client: BaseDBClient) -> None:
+    """Note when the dialect opts out of SQLAlchemy's compiled statement cache.
+
+    Logged at INFO as several supported dialects (e.g. DuckDB) opt out and
+    users cannot change it, while a client is created on every cache refresh.
+    """
+    dialect = db_client.engine.dialect
+    if not getattr(dialect, "supports_statement_cache", False):
+        logger.info(
+            f"The '{dialect.name}' dialect does not support SQLAlchemy statement caching. "
+            "Every query will be compiled from scratch."
+        )
+
 
 @retry(
     stop=stop_after_attempt(3),
@@ -155,20 +168,24 @@ def get_db_client() -> BaseDBClient:
     logger.info("Connecting to database...")
 
     try:
+        db_client: BaseDBClient
         if settings.DATASOURCE_USE_TRINO:
-            return _create_trino_client()
+            db_client = _create_trino_client()
         elif settings.DATASOURCE_USE_AZURE_MANAGED_IDENTITY:
-            return _create_azure_client()
+            db_client = _create_azure_client()
         elif settings.DATASOURCE_DB_DRIVERNAME == "duckdb":
-            return _create_duckdb_client()
+            db_client = _create_duckdb_client()
         elif settings.DATASOURCE_USE_SNOWFLAKE:
-            return _create_snowflake_client()
+            db_client = _create_snowflake_client()
         else:
-            return _create_sync_client()
+            db_client = _create_sync_client()
     except TypeError as e:
         logger.error(str(e))
         exit()
 
+    _check_statement_cache(db_client)
+    return db_client
+
 
 __all__ = [
     "BaseDBClient",
@@ -4,8 +4,11 @@ from sqlalchemy import create_engine, inspect, event
 from azure.identity import DefaultAzureCredential, ManagedIdentityCredential
 from azure.core.credentials import TokenCredential
 from hutch_bunny.core.logger import logger
+from hutch_bunny.core.settings import Settings
 from .sync import SyncDBClient
 
+settings = Settings()
+
 
 class AzureManagedIdentityDBClient(SyncDBClient):
     def __init__(
@@ -42,7 +45,9 @@ class AzureManagedIdentityDBClient(SyncDBClient):
         url = "mssql+pyodbc:///?odbc_connect={0}".format(quote(url))
 
         self.schema = schema if schema is not None and len(schema) > 0 else None
-        self._engine = create_engine(url=url)
+        self._engine = create_engine(
+            url=url, query_cache_size=settings.DATASOURCE_QUERY_CACHE_SIZE
+        )
 
         # Set up Azure managed identity authentication
         self.managed_identity_client_id = managed_identity_client_id
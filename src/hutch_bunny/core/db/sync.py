@@ -33,7 +33,9 @@ class SyncDBClient(BaseDBClient):
         )
 
         self.schema = schema if schema is not None and len(schema) > 0 else None
-        self._engine = create_engine(url=url)
+        self._engine = create_engine(
+            url=url, query_cache_size=settings.DATASOURCE_QUERY_CACHE_SIZE
+        )
 
         if self.schema is not None:
             self._engine.update_execution_options(
@@ -1,4 +1,5 @@
 """Database utilities and constants for Hutch Bunny."""
+from logging import INFO
 from opentelemetry import trace 
 from sqlalchemy.engine import Engine 
 from sqlalchemy.sql import Executable
@@ -37,7 +38,14 @@ def expand_short_drivers(
 
 @trace_operation("log_query", span_kind=trace.SpanKind.INTERNAL)
 def log_query(stmnt: Executable, engine: Engine) -> None:
-    """Log the compiled SQL query."""
+    """Log the compiled SQL query.
+
+    Rendering literal binds walks the whole statement, so it is skipped
+    entirely unless INFO logging is enabled.
+    """
+    if not logger.isEnabledFor(INFO):
+        return
+
     try:
         compiled = stmnt.compile(
             dialect=engine.dialect,
@@ -1,5 +1,4 @@
 import base64 
-from copy import deepcopy
 
 
 def low_number_suppression(value: int | float, threshold: int = 10) -> int | float:
@@ -43,10 +42,13 @@ def rounding(value: int | float, nearest: int = 10) -> int | float:
     return nearest * round(value / nearest)
 
 
+_FILTER_ACTIONS = {"Low Number Suppression": low_number_suppression, "Rounding": rounding}
+
+
 def apply_filters(value: int | float, filters: list) -> int:
     """Iterate over a list of filters and apply them to the supplied value.
 
-    Makes a deep copy of the filters list to avoid mutating the original list.
+    The filters are read without being modified, so the same list can be reused.
 
     Args:
         value (int | float): The value to be filtered.
@@ -56,12 +58,11 @@ def apply_filters(value: int | float, filters: list) -> int:
         int | float: The filtered value.
     """
 
-    actions = {"Low Number Suppression": low_number_suppression, "Rounding": rounding}
     result = value
-    filters_copy = deepcopy(filters)
-    for f in filters_copy:
-        if action := actions.get(f.pop("id", None)):
-            result = action(result, **f)
+    for f in filters:
+        if action := _FILTER_ACTIONS.get(f.get("id")):
+            # Pass every key except the id, without copying or mutating the filter
+            result = action(result, **{k: v for k, v in f.items() if k != "id"})
             if result == 0:
                 break  # don't apply any more filters
     return int(result)
@@ -5,6 +5,18 @@ from pydantic import BaseModel, ConfigDict, Field
 from hutch_bunny.core.omop import Varcat
 
 
+# Numeric range in the `lower..upper` format
+NUMERIC_RANGE_PATTERN = re.compile(r"(-?\d*\.\d+|\d+|null)\.\.(-?\d*\.\d+|null)")
+
+# Numeric range in the `lower|upper` format
+PIPE_RANGE_PATTERN = re.compile(r"([^|]*)\|([^|]*)")
+
+# Time in the `left|right:CATEGORY:UNIT` or `value:CATEGORY:UNIT` format
+TIME_PATTERN = re.compile(
+    r"(?P<value>(?P<left>[^|:]*)(?:\|(?P<right>[^|:]*))?):(?P<category>[^:]*):(?P<unit>[^:]*)"
+)
+
+
 class Rule(BaseModel):
     """
     A rule in a group of rules.
@@ -164,8 +176,7 @@ class Rule(BaseModel):
         Returns:
             tuple[float | None, float | None]: The parsed numeric values.
         """
-        pattern = re.compile(r"(-?\d*\.\d+|\d+|null)\.\.(-?\d*\.\d+|null)")
-        if match := re.search(pattern, value):
+        if match := NUMERIC_RANGE_PATTERN.search(value):
             lower, upper = match.groups()
             try:
                 min_value = float(lower)
@@ -189,12 +200,15 @@ class Rule(BaseModel):
         Returns:
             tuple[float | None, float | None]: The parsed numeric values.
         """
+        match = PIPE_RANGE_PATTERN.fullmatch(value)
+        if match is None:
+            return None, None
+        min_str, max_str = match.groups()
         try:
-            min_str, max_str = value.split("|")
             min_value = float(min_str) if min_str else None
             max_value = float(max_str) if max_str else None
             return min_value, max_value
-        except (ValueError, AttributeError):
+        except ValueError:
             return None, None
 
     def _parse_time(self) -> None:
@@ -209,24 +223,19 @@ class Rule(BaseModel):
         if not self.time:
             return
             
-        try:
-            time_value, time_category, time_unit = self.time.split(":")
-            self.time_value = time_value
-            self.time_category = time_category
-            self.time_unit = time_unit
-            
-            # Parse left and right values from time_value
-            if "|" in time_value:
-                left_value, right_value = time_value.split("|")
-                self.greater_than_value = left_value if left_value else ""
-                self.less_than_value = right_value if right_value else ""
-            else:
-                self.greater_than_value = time_value
-                self.less_than_value = ""
-        except (ValueError, AttributeError):
-            # If parsing fails, set all values to None
+        match = TIME_PATTERN.fullmatch(self.time)
+        if match is None:
+            # If parsing fails, leave all values as None
             self.time_value = None
             self.time_category = None
             self.time_unit = None
             self.greater_than_value = None
             self.less_than_value = None
+            return
+
+        self.time_value = match["value"]
+        self.time_category = match["category"]
+        self.time_unit = match["unit"]
+        # Without a `|` the value is a lower bound
+        self.greater_than_value = match["left"]
+        self.less_than_value = match["right"] or ""
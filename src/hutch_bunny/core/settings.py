@@ -52,6 +52,10 @@ class Settings(BaseSettings):
         description="Enable support for querying OMOP location table records",
         default=False,
     )
+    OMOP_DOMAIN_TABLES_ONLY: bool = Field(
+        description="Only search the table matching a concept's domain in the local vocabulary, instead of all event tables",
+        default=False,
+    )
 
     LOGGER_NAME: str = "hutch"
     LOGGER_LEVEL: str = Field(
@@ -94,6 +98,10 @@ class Settings(BaseSettings):
     DATASOURCE_DB_CATALOG: str = Field(
         description="The catalog for the datasource database", default="hutch"
     )
+    DATASOURCE_QUERY_CACHE_SIZE: int = Field(
+        description="The number of compiled SQL statements cached per database engine",
+        default=1200,
+    )
     DATASOURCE_DUCKDB_PATH_TO_DB: str = Field(
         description="The path to the DuckDB database file", default="/data/file.db"
     )
@@ -1,13 +1,20 @@
+from collections import OrderedDict
+from datetime import date, datetime
 from logging import DEBUG
-from typing import TypedDict, Union, Literal
+from typing import Any, Callable, Hashable, TypedDict, TypeVar, Union, Literal
 from sqlalchemy import (
     CompoundSelect,
+    Connection,
     func,
     ColumnElement,
     select,
     Select,
+    case,
+    distinct,
+    except_,
     intersect,
     union,
+    union_all,
     literal, 
     or_
 )
@@ -38,6 +45,88 @@ from hutch_bunny.core.settings import Settings
 
 settings = Settings()
 
+T = TypeVar("T")
+
+# Builder steps for a non-Person rule: (whether it applies, builder method, method arguments)
+RULE_STEPS: tuple[
+    tuple[
+        Callable[[Rule], bool],
+        Callable[..., OMOPRuleQueryBuilder],
+        Callable[[Rule], tuple[Any, ...]],
+    ],
+    ...,
+] = (
+    (
+        lambda rule: bool(rule.value),
+        OMOPRuleQueryBuilder.add_concept_constraint,
+        lambda rule: (int(rule.value),),
+    ),
+    (
+        lambda rule: bool(rule.greater_than_value or rule.less_than_value)
+        and rule.time_category == "AGE",
+        OMOPRuleQueryBuilder.add_age_constraint,
+        lambda rule: (rule.greater_than_value, rule.less_than_value),
+    ),
+    (
+        lambda rule: bool(rule.greater_than_value or rule.less_than_value)
+        and rule.time_category == "TIME",
+        OMOPRuleQueryBuilder.add_temporal_constraint,
+        lambda rule: (rule.greater_than_value or "", rule.less_than_value or ""),
+    ),
+    (
+        lambda rule: rule.min_value is not None and rule.max_value is not None,
+        OMOPRuleQueryBuilder.add_numeric_range,
+        lambda rule: (rule.min_value, rule.max_value),
+    ),
+    (
+        lambda rule: bool(rule.secondary_modifier),
+        OMOPRuleQueryBuilder.add_secondary_modifiers,
+        lambda rule: (rule.secondary_modifier,),
+    ),
+    (
+        lambda rule: rule.center_lat is not None
+        and rule.center_lon is not None
+        and rule.geo_radius_meters is not None,
+        OMOPRuleQueryBuilder.add_haversine_radius_constraint,
+        lambda rule: (rule.center_lat, rule.center_lon, rule.geo_radius_meters),
+    ),
+)
+
+# Maximum number of built final queries kept for reuse across identical cohorts
+FINAL_QUERY_CACHE_SIZE = 128
+_final_query_cache: OrderedDict[Hashable, Select[Tuple[int]]] = OrderedDict()
+
+# Maximum number of built group queries kept for reuse across cohorts sharing a group
+GROUP_QUERY_CACHE_SIZE = 256
+_group_query_cache: OrderedDict[
+    Hashable, Union[Select[Tuple[int]], CompoundSelect[Tuple[int]]]
+] = OrderedDict()
+
+# Maximum number of built rule queries kept for reuse across groups and cohorts
+RULE_QUERY_CACHE_SIZE = 1024
+_rule_query_cache: OrderedDict[Hashable, CompoundSelect[Tuple[int]]] = OrderedDict()
+
+# Maximum number of concept domains kept across queries; the vocabulary is static while running
+CONCEPT_DOMAIN_CACHE_SIZE = 4096
+_concept_domain_cache: OrderedDict[tuple[str, int], str | None] = OrderedDict()
+
+
+def _cache_get(cache: OrderedDict[Hashable, T], key: Hashable | None) -> T | None:
+    """Return the cached value for key, marking it as recently used."""
+    if key is None or key not in cache:
+        return None
+    cache.move_to_end(key)
+    return cache[key]
+
+
+def _cache_put(cache: OrderedDict[Hashable, T], key: Hashable | None, value: T, max_size: int) -> None:
+    """Store value under key, evicting the least recently used entry when full."""
+    if key is None:
+        return
+    cache[key] = value
+    if len(cache) > max_size:
+        cache.popitem(last=False)
+
 
 class ResultModifier(TypedDict):
     id: str
@@ -48,7 +137,7 @@ Key = Literal["threshold", "nearest"]
 
 
 class RuleTableQuery(TypedDict):
-    union_query: CompoundSelect
+    union_query: CompoundSelect[Tuple[int]]
     inclusion: bool
 
 
@@ -58,6 +147,9 @@ class AvailabilitySolver():
         self.db_client = db_client
         self.query = query
         self.person_constraint_builder = PersonConstraintBuilder(db_client)
+        self._modifier_source: list[ResultModifier] | None = None
+        self._modifier_map: dict[tuple[str, Key], int | None] = {}
+        self._reference_date: datetime | None = None
 
     @retry(
         stop=stop_after_attempt(3),
@@ -73,32 +165,63 @@ class AvailabilitySolver():
         3. Combining groups with AND/OR logic
         4. Executing the final query and applying filters
         """
-        concepts = self._find_concepts(self.query.cohort.groups)
+        # A cohort without any rules selects no one, so skip the database entirely
+        if not any(group.rules for group in self.query.cohort.groups):
+            logger.debug("Cohort has no rules, returning an empty count")
+            return apply_filters(0, results_modifiers)
+
+        # TIME rules are all resolved relative to the moment solving started
+        self._reference_date = datetime.now()
         low_number = self._extract_modifier(results_modifiers, "Low Number Suppression", "threshold", 10)
         rounding = self._extract_modifier(results_modifiers, "Rounding", "nearest", 10)
 
+        # A single connection serves both the concept lookup and the final query
         with self.db_client.engine.connect() as con:
-            group_queries = []
+            concepts = self._find_concepts(con, self.query.cohort.groups)
+            cache_key = self._final_query_cache_key(concepts, rounding, low_number)
+            final_query = _cache_get(_final_query_cache, cache_key)
 
-            for group in self.query.cohort.groups:
-                group_query = self._build_group_query(group, concepts)
-                group_queries.append(group_query)
+            if final_query is not None:
+                logger.debug("Reusing cached final query for identical cohort")
+            else:
+                group_queries = []
+                groups_operator = self.query.cohort.groups_operator
+                skipped_unconstrained = False
+
+                for group in self.query.cohort.groups:
+                    # A group without constraints matches everyone, so it adds nothing to
+                    # an AND and makes an OR match everyone
+                    if self._is_unconstrained_group(group, concepts):
+                        skipped_unconstrained = True
+                        continue
+
+                    group_cache_key = self._group_query_cache_key(group, concepts)
+                    group_query = _cache_get(_group_query_cache, group_cache_key)
+                    if group_query is None:
+                        group_query = self._build_group_query(group, concepts)
+                        _cache_put(_group_query_cache, group_cache_key, group_query, GROUP_QUERY_CACHE_SIZE)
+                    group_queries.append(group_query)
+
+                if skipped_unconstrained and (not group_queries or groups_operator == "OR"):
+                    group_queries = [select(Person.person_id)]
+
+                final_query = self._construct_final_query(
+                    group_queries,
+                    rounding, 
+                    low_number
+                )
+                _cache_put(_final_query_cache, cache_key, final_query, FINAL_QUERY_CACHE_SIZE)
 
-            final_query = self._construct_final_query(
-                group_queries,
-                rounding, 
-                low_number
-            )
+            log_query(final_query, self.db_client.engine)
 
             try:
-                output = con.execute(final_query).fetchone()
-                count = int(output[0]) if output is not None else 0
+                count = int(con.execute(final_query).scalar() or 0)
             except Exception as e:
                 logger.error(str(e))
 
         return apply_filters(count, results_modifiers)
 
-    def _find_concepts(self, groups: list[Group]) -> dict[str, str]:
+    def _find_concepts(self, con: Connection, groups: list[Group]) -> dict[str, str]:
         """Function that takes all the concept IDs in the cohort definition, looks them up in the OMOP database
         to extract the concept_id and domain and place this within a dictionary for lookup during other query building
 
@@ -115,19 +238,112 @@ class AvailabilitySolver():
                 if rule.value:
                     concept_ids.add(int(rule.value))
 
-        concept_query = (
-            # order must be .concept_id, .domain_id
-            select(Concept.concept_id, Concept.domain_id)
-            .where(Concept.concept_id.in_(concept_ids))
-            .distinct()
-        )
-        with self.db_client.engine.connect() as con:
-            result = con.execute(concept_query)
-            concept_dict = {
-                str(concept_id): domain_id for concept_id, domain_id in result
-            }
+        # Domains are cached per database, including concepts that were not found
+        engine_key = str(self.db_client.engine.url)
+        concept_dict: dict[str, str] = {}
+        missing_ids = set()
+        for concept_id in concept_ids:
+            cache_key = (engine_key, concept_id)
+            if cache_key not in _concept_domain_cache:
+                missing_ids.add(concept_id)
+                continue
+            _concept_domain_cache.move_to_end(cache_key)
+            domain_id = _concept_domain_cache[cache_key]
+            if domain_id is not None:
+                concept_dict[str(concept_id)] = domain_id
+
+        if missing_ids:
+            concept_query = (
+                # order must be .concept_id, .domain_id
+                select(Concept.concept_id, Concept.domain_id)
+                .where(Concept.concept_id.in_(missing_ids))
+                .distinct()
+            )
+            found = {concept_id: domain_id for concept_id, domain_id in con.execute(concept_query)}
+            for concept_id in missing_ids:
+                _concept_domain_cache[(engine_key, concept_id)] = found.get(concept_id)
+                if len(_concept_domain_cache) > CONCEPT_DOMAIN_CACHE_SIZE:
+                    _concept_domain_cache.popitem(last=False)
+            concept_dict.update(
+                {str(concept_id): domain_id for concept_id, domain_id in found.items()}
+            )
+
         return concept_dict
 
+    def _group_query_cache_key(self, group: Group, concepts: dict[str, str]) -> Hashable | None:
+        """
+        Build the key under which the query for a group is cached.
+
+        Rule values are embedded in the statement as bound literals, so the key covers
+        the full group definition rather than just its shape. Groups with TIME rules
+        are evaluated against the current time when built and are never cached.
+
+        Args:
+            group: The group that contains the rules to be assembled
+            concepts: a dictionary that maps the concepts IDs to the domains they belong
+
+        Returns:
+            A hashable cache key, or None if the group must not be cached
+        """
+        if any(rule.time_category == "TIME" for rule in group.rules):
+            return None
+
+        return (
+            *self._environment_cache_key(),
+            group.rules_operator,
+            tuple(self._rule_fingerprint(rule) for rule in group.rules),
+            tuple(concepts.get(rule.value) for rule in group.rules),
+        )
+
+    def _environment_cache_key(self) -> tuple[Hashable, ...]:
+        """The engine and settings every built query depends on, shared by all query cache keys."""
+        return (
+            str(self.db_client.engine.url),
+            settings.OMOP_SPECIMEN_ENABLED,
+            settings.OMOP_LOCATION_ENABLED,
+            settings.OMOP_DOMAIN_TABLES_ONLY,
+            # Person age constraints are resolved against the current year
+            date.today().year,
+        )
+
+    @staticmethod
+    def _rule_fingerprint(rule: Rule) -> str:
+        """
+        Serialise a rule from its parsed fields, so rules written differently but
+        searching for the same thing (e.g. `10:AGE:Y` and `10|:AGE:Y`) share a fingerprint.
+        """
+        return rule.model_dump_json(exclude={"time", "time_value", "raw_range"})
+
+    def _final_query_cache_key(
+        self,
+        concepts: dict[str, str],
+        rounding: int,
+        low_number: int
+    ) -> Hashable | None:
+        """
+        Build the key under which the final query for this cohort is cached.
+
+        Args:
+            concepts: a dictionary that maps the concepts IDs to the domains they belong
+            rounding: Rounding factor for the final count
+            low_number: Low number suppression threshold for the final count
+
+        Returns:
+            A hashable cache key, or None if any group must not be cached
+        """
+        group_keys = tuple(
+            self._group_query_cache_key(group, concepts) for group in self.query.cohort.groups
+        )
+        if None in group_keys:
+            return None
+
+        return (
+            self.query.cohort.groups_operator,
+            group_keys,
+            rounding,
+            low_number,
+        )
+
     def _extract_modifier(
         self,
         results_modifiers: list[ResultModifier],
@@ -135,17 +351,24 @@ class AvailabilitySolver():
         key: Key,
         default_value: int = 10,
     ) -> int:
-        for item in results_modifiers:
-            if item["id"] == result_id:
-                value = item.get(key)  # type: int | None
-                return value if value is not None else default_value
-        return default_value
+        # Index the modifiers in one pass, rebuilding only when given a different list
+        if results_modifiers is not self._modifier_source:
+            self._modifier_map = {}
+            modifier_keys: tuple[Key, ...] = ("threshold", "nearest")
+            for item in results_modifiers:
+                for modifier_key in modifier_keys:
+                    # The first modifier with a given id wins
+                    self._modifier_map.setdefault((item["id"], modifier_key), item.get(modifier_key))
+            self._modifier_source = results_modifiers
+
+        value = self._modifier_map.get((result_id, key))
+        return value if value is not None else default_value
 
     def _build_group_query(
         self,
         group: Group,
         concepts: dict[str, str]
-    ) -> Union[Select[Tuple[int]], CompoundSelect]:
+    ) -> Union[Select[Tuple[int]], CompoundSelect[Tuple[int]]]:
         """
         Build query for a single group - a nested SQL expression.
 
@@ -160,60 +383,107 @@ class AvailabilitySolver():
 
         rule_table_queries: list[RuleTableQuery] = []
         person_constraints: list[ColumnElement[bool]] = []
+        # Concept-only rules whose matches are unioned, batched by (inclusion, domain)
+        concept_batches: dict[tuple[bool, str | None], list[Rule]] = {}
 
         for rule in group.rules:
             inclusion_criteria = rule.operator == "="
             if rule.varcat == Varcat.PERSON:
                 constraints = self.person_constraint_builder.build_constraints(rule, concepts)
                 person_constraints.extend(constraints)
+                continue
+
+            domain = concepts.get(rule.value) if settings.OMOP_DOMAIN_TABLES_ONLY else None
+            # Exclusions are always unioned, inclusions only within an OR group
+            if self._is_concept_only_rule(rule) and (
+                not inclusion_criteria or group.rules_operator == "OR"
+            ):
+                concept_batches.setdefault((inclusion_criteria, domain), []).append(rule)
             else:
-                rule_union = self._build_rule_query(rule)
                 rule_table_queries.append({
-                    'union_query': rule_union,
+                    'union_query': self._build_cached_rule_query(rule, domain),
                     'inclusion': inclusion_criteria
                 })
 
+        for (inclusion_criteria, domain), batch in concept_batches.items():
+            if len(batch) > 1:
+                rule_union = self._build_concept_set_query(
+                    [int(rule.value) for rule in batch], domain
+                )
+            else:
+                rule_union = self._build_cached_rule_query(batch[0], domain)
+            rule_table_queries.append({
+                'union_query': rule_union,
+                'inclusion': inclusion_criteria
+            })
+
         return self._construct_group_query(group, person_constraints, rule_table_queries)
 
-    def _build_rule_query(self, rule: Rule) -> CompoundSelect:
-        """Build query for a single non-Person rule."""
+    def _is_unconstrained_group(self, group: Group, concepts: dict[str, str]) -> bool:
+        """Whether the group has no rules, or only Person rules that produce no constraint, so it matches everyone."""
+        return all(
+            rule.varcat == Varcat.PERSON
+            and not self.person_constraint_builder.build_constraints(rule, concepts)
+            for rule in group.rules
+        )
+
+    @staticmethod
+    def _is_concept_only_rule(rule: Rule) -> bool:
+        """Whether the rule only matches on its concept, with no time, range, modifier or geo constraint."""
+        return (
+            bool(rule.value)
+            and rule.varcat != Varcat.LOCATION
+            and not rule.time
+            and rule.min_value is None
+            and rule.max_value is None
+            and not rule.secondary_modifier
+            and rule.geo_radius_meters is None
+        )
+
+    def _build_concept_set_query(
+        self, concept_ids: list[int], domain: str | None = None
+    ) -> CompoundSelect[Tuple[int]]:
+        """Build one query matching any of several concept-only rules, scanning each table once."""
         builder = OMOPRuleQueryBuilder(
             self.db_client,
             include_specimen=settings.OMOP_SPECIMEN_ENABLED,
             include_location=settings.OMOP_LOCATION_ENABLED,
-            varcat=rule.varcat,
+            domain=domain,
         )
+        builder.add_concept_set_constraint(concept_ids)
+        return builder.build()
 
-        if rule.value:
-            builder.add_concept_constraint(int(rule.value))
-
-        valid_time_constraint = rule.greater_than_value or rule.less_than_value
-
-        if valid_time_constraint and rule.time_category == "AGE":
-            builder.add_age_constraint(
-                greater_than_value=rule.greater_than_value,
-                less_than_value=rule.less_than_value
-            )
-        elif valid_time_constraint and rule.time_category == "TIME":
-            builder.add_temporal_constraint(
-                greater_than_time=rule.greater_than_value or "",
-                less_than_time=rule.less_than_value or ""
-            )
-
-        if rule.min_value is not None and rule.max_value is not None:
-            builder.add_numeric_range(rule.min_value, rule.max_value)
-
-        if rule.secondary_modifier:
-            builder.add_secondary_modifiers(rule.secondary_modifier)
+    def _build_cached_rule_query(
+        self, rule: Rule, domain: str | None = None
+    ) -> CompoundSelect[Tuple[int]]:
+        """Build query for a single non-Person rule, reusing the query of an identical rule if cached."""
+        cache_key = (
+            None
+            if rule.time_category == "TIME"
+            else (*self._environment_cache_key(), self._rule_fingerprint(rule), domain)
+        )
+        rule_query = _cache_get(_rule_query_cache, cache_key)
+        if rule_query is None:
+            rule_query = self._build_rule_query(rule, domain)
+            _cache_put(_rule_query_cache, cache_key, rule_query, RULE_QUERY_CACHE_SIZE)
+        return rule_query
+
+    def _build_rule_query(
+        self, rule: Rule, domain: str | None = None
+    ) -> CompoundSelect[Tuple[int]]:
+        """Build query for a single non-Person rule, limited to the concept's domain table if known."""
+        builder = OMOPRuleQueryBuilder(
+            self.db_client,
+            include_specimen=settings.OMOP_SPECIMEN_ENABLED,
+            include_location=settings.OMOP_LOCATION_ENABLED,
+            varcat=rule.varcat,
+            domain=domain,
+            reference_date=self._reference_date,
+        )
 
-        if (
-            rule.center_lat is not None
-            and rule.center_lon is not None
-            and rule.geo_radius_meters is not None
-        ):
-            builder.add_haversine_radius_constraint(
-                rule.center_lat, rule.center_lon, rule.geo_radius_meters
-            )
+        for applies, step, arguments in RULE_STEPS:
+            if applies(rule):
+                step(builder, *arguments(rule))
 
         return builder.build()
 
@@ -222,7 +492,7 @@ class AvailabilitySolver():
         current_group: Group,
         person_constraints_for_group: list[ColumnElement[bool]],
         rule_table_queries: list[RuleTableQuery]
-    ) -> Union[Select[Tuple[int]], CompoundSelect]:
+    ) -> Union[Select[Tuple[int]], CompoundSelect[Tuple[int]]]:
         """
         Construct the query for a single group by processing inclusion/exclusion rules.
 
@@ -235,8 +505,12 @@ class AvailabilitySolver():
             The constructed group query
         """
         # Build the group query using UNION approach
-        inclusion_queries: list[Union[Select[Tuple[int]], CompoundSelect]] = []
-        exclusion_queries: list[Union[Select[Tuple[int]], CompoundSelect]] = []
+        inclusion_queries: list[
+            Union[Select[Tuple[int]], CompoundSelect[Tuple[int]]]
+        ] = []
+        exclusion_queries: list[
+            Union[Select[Tuple[int]], CompoundSelect[Tuple[int]]]
+        ] = []
 
         # Add person constraints as a separate query
         if person_constraints_for_group:
@@ -269,9 +543,25 @@ class AvailabilitySolver():
 
         # Create the final group query (without CTEs at this level)
         if inclusion_queries:
-            if current_group.rules_operator == "AND":
+            if current_group.rules_operator == "AND" and len(inclusion_queries) > 2:
+                # For AND logic over many rules, tag each rule's members and keep the people
+                # found under every tag, so one aggregation replaces a chain of INTERSECTs
+                tagged_members = union_all(
+                    *[
+                        select(query.subquery().c.person_id, literal(i).label("rule_tag"))
+                        for i, query in enumerate(inclusion_queries)
+                    ]
+                ).subquery()
+                group_query: Union[Select[Tuple[int]], CompoundSelect[Tuple[int]]] = (
+                    select(tagged_members.c.person_id)
+                    .group_by(tagged_members.c.person_id)
+                    .having(
+                        func.count(distinct(tagged_members.c.rule_tag)) == len(inclusion_queries)
+                    )
+                )
+            elif current_group.rules_operator == "AND":
                 # For AND logic, use INTERSECT which is more efficient than joins
-                group_query: Union[Select[Tuple[int]], CompoundSelect] = inclusion_queries[0]
+                group_query = inclusion_queries[0]
                 for query in inclusion_queries[1:]:
                     group_query = intersect(group_query, query)
             else:
@@ -286,14 +576,12 @@ class AvailabilitySolver():
             logger.debug(f"Processing {len(exclusion_queries)} exclusion queries")
             try:
                 # Union all exclusion queries
-                exclusion_union = union(*exclusion_queries)
+                exclusion_union = union_all(*exclusion_queries)
                 logger.debug("Exclusion union created successfully")
 
-                # Exclude people who match any exclusion criteria
-                exclusion_query = select(Person.person_id).where(
-                    ~Person.person_id.in_(select(exclusion_union.subquery()))
-                )
-                group_query = intersect(group_query, exclusion_query)
+                # Exclude people who match any exclusion criteria with a set difference,
+                # avoiding a separate scan of the Person table
+                group_query = except_(group_query, exclusion_union)
 
                 logger.debug("Exclusion queries processed successfully")
             except Exception as e:
@@ -304,76 +592,65 @@ class AvailabilitySolver():
 
     def _construct_final_query(
         self,
-        all_groups_queries: list[Union[Select[Tuple[int]], CompoundSelect]],
+        all_groups_queries: list[Union[Select[Tuple[int]], CompoundSelect[Tuple[int]]]],
         rounding: int,
         low_number: int
     ) -> Select[Tuple[int]]:
         """
-        Construct the final query by applying OR/AND logic between groups using CTEs.
+        Construct the final query by applying OR/AND logic between groups in a single pass.
+
+        Each group's members are tagged with a group marker and combined with
+        UNION ALL, then aggregated per person so that one scan serves every group:
+        - AND logic: a person must appear under every group marker
+        - OR logic: a person must appear under any group marker
 
         Args:
             all_groups_queries: List of queries for each group
             rounding: Rounding factor for the final count
+            low_number: Low number suppression threshold for the final count
 
         Returns:
             The final query that counts the results with appropriate rounding
         """
-        if self.query.cohort.groups_operator == "OR":
-            # For OR logic between groups, use UNION with CTEs
-            if all_groups_queries:
-                # Create CTEs for all group queries
-                group_ctes = []
-                for i, query in enumerate(all_groups_queries):
-                    cte_name = f"final_group_{i}"
-                    cte = query.cte(name=cte_name)
-                    group_ctes.append(cte)
-
-                # Union all group CTEs by selecting from them
-                group_union_queries = [select(cte) for cte in group_ctes]
-                final_union = union(*group_union_queries)
-
-                if rounding > 0:
-                    full_query_all_groups = select(
-                        func.round((func.count() / rounding), 0) * rounding
-                    ).select_from(final_union.subquery())
-                else:
-                    full_query_all_groups = select(func.count()).select_from(final_union.subquery())
-            else:
-                # Fallback to empty query
-                full_query_all_groups = select(func.count()).where(literal(False))
-        else:
-            # For AND logic between groups, use INTERSECT with CTEs
-            if all_groups_queries:
-                # Create CTEs for all group queries
-                group_ctes = []
-                for i, query in enumerate(all_groups_queries):
-                    cte_name = f"final_group_{i}"
-                    cte = query.cte(name=cte_name)
-                    group_ctes.append(cte)
-
-                # Use INTERSECT for AND logic between groups
-                group_intersect_queries = [select(cte) for cte in group_ctes]
-                final_intersect = intersect(*group_intersect_queries)
-
-                if rounding > 0:
-                    full_query_all_groups = select(
-                        func.round((func.count() / rounding), 0) * rounding
-                    ).select_from(final_intersect.subquery())
-                else:
-                    full_query_all_groups = select(func.count()).select_from(final_intersect.subquery())
+        if all_groups_queries:
+            # Create CTEs for all group queries and tag their members with the group they came from
+            group_ctes = [
+                query.cte(name=f"final_group_{i}")
+                for i, query in enumerate(all_groups_queries)
+            ]
+            tagged_members = union_all(
+                *[
+                    select(cte.c.person_id, literal(i).label("group_marker"))
+                    for i, cte in enumerate(group_ctes)
+                ]
+            ).subquery("tagged_members")
+
+            cohort_members = select(tagged_members.c.person_id).group_by(
+                tagged_members.c.person_id
+            )
+            if self.query.cohort.groups_operator == "AND":
+                # For AND logic between groups, the person must be a member of every group
+                cohort_members = cohort_members.having(
+                    *[
+                        func.sum(case((tagged_members.c.group_marker == i, 1), else_=0)) >= 1
+                        for i in range(len(group_ctes))
+                    ]
+                )
+            # For OR logic between groups, every grouped person is already a member of at least one group
 
+            if rounding > 0:
+                full_query_all_groups = select(
+                    func.round((func.count() / rounding), 0) * rounding
+                ).select_from(cohort_members.subquery())
             else:
-                # Fallback to empty query
-                full_query_all_groups = select(func.count()).where(literal(False))
+                full_query_all_groups = select(func.count()).select_from(cohort_members.subquery())
+        else:
+            # Fallback to empty query
+            full_query_all_groups = select(func.count()).where(literal(False))
 
         if low_number > 0:
             full_query_all_groups = full_query_all_groups.having(
                 func.count() >= low_number
             )
 
-        log_query(
-            full_query_all_groups, 
-            self.db_client.engine
-        )
-
         return full_query_all_groups
@@ -1,8 +1,10 @@
 import os
+from functools import lru_cache
+from operator import attrgetter
 from typing import Tuple, List, Dict
 from pydantic import BaseModel
 
-from sqlalchemy import Select, distinct, func, select
+from sqlalchemy import Select, func, select
 
 from hutch_bunny.core.obfuscation import apply_filters
 from hutch_bunny.core.db import BaseDBClient
@@ -22,6 +24,10 @@ from hutch_bunny.core.rquest_models.distribution import DistributionQuery
 from hutch_bunny.core.solvers.availability_solver import ResultModifier
 
 
+# Maximum number of built gender queries kept, one per distinct (rounding, low_number)
+GENDER_QUERY_CACHE_SIZE = 32
+
+
 class DemographicsRow(BaseModel):
     """
     A single row in the demographics output.
@@ -44,6 +50,30 @@ class DemographicsRow(BaseModel):
     omop_descr: str = ""
 
 
+# Row fields in the order of DemographicsDistributionQuerySolver.output_cols
+_ROW_ATTRS = tuple(
+    attrgetter(field)
+    for field in (
+        "biobank",
+        "code",
+        "description",
+        "count",
+        "min_val",
+        "q1",
+        "median",
+        "mean",
+        "q3",
+        "max_val",
+        "alternatives",
+        "dataset",
+        "omop",
+        "omop_descr",
+        "category",
+    )
+)
+_ROW_TEMPLATE = "\t".join(["%s"] * len(_ROW_ATTRS))
+
+
 class DemographicsDistributionQuerySolver:
     """
     Solve distribution queries for demographics queries.
@@ -96,32 +126,30 @@ class DemographicsDistributionQuerySolver:
         Returns:
             Tuple[int, int]: The low number and rounding values.
         """
-        low_number = next(
-            (
-                item["threshold"]
-                if item["threshold"] is not None
-                else self.DEFAULT_LOW_NUMBER
-                for item in results_modifier
-                if item["id"] == "Low Number Suppression"
-            ),
-            self.DEFAULT_LOW_NUMBER,
+        # Index the modifiers by id in one pass, keeping the first of any duplicates
+        modifiers = {item["id"]: item for item in reversed(results_modifier)}
+
+        low_number_modifier = modifiers.get("Low Number Suppression")
+        low_number = (
+            low_number_modifier["threshold"]
+            if low_number_modifier is not None
+            and low_number_modifier["threshold"] is not None
+            else self.DEFAULT_LOW_NUMBER
         )
-        rounding = next(
-            (
-                item["nearest"]
-                if item["nearest"] is not None
-                else self.DEFAULT_ROUNDING
-                for item in results_modifier
-                if item["id"] == "Rounding"
-            ),
-            self.DEFAULT_ROUNDING,
+        rounding_modifier = modifiers.get("Rounding")
+        rounding = (
+            rounding_modifier["nearest"]
+            if rounding_modifier is not None
+            and rounding_modifier["nearest"] is not None
+            else self.DEFAULT_ROUNDING
         )
         return low_number, rounding
 
+    @staticmethod
     def _build_gender_query(
-        self, rounding: int, low_number: int
-    ) -> Select[Tuple[int, int]]:
-        """Build the query for gender distribution.
+        rounding: int, low_number: int
+    ) -> Select[Tuple[int, int, str]]:
+        """Build the query for gender distribution, including the name of each gender concept.
 
         Args:
             rounding: int
@@ -132,35 +160,44 @@ class DemographicsDistributionQuerySolver:
         Returns:
             select: The query for gender distribution.
         """
+        # No DISTINCT needed: person_id is unique in person, and concept_id is
+        # unique in concept, so the join cannot repeat a person
         if rounding > 0:
-            stmnt = select(
-                func.round((func.count(distinct(Person.person_id)) / rounding), 0)
-                * rounding,
-                Person.gender_concept_id,
-            ).group_by(Person.gender_concept_id)
+            count = func.round((func.count(Person.person_id) / rounding), 0) * rounding
         else:
-            stmnt = select(
-                func.count(distinct(Person.person_id)), Person.gender_concept_id
-            ).group_by(Person.gender_concept_id)
+            count = func.count(Person.person_id)
+
+        # Outer join so people with an unmapped gender still add to the total count
+        stmnt = (
+            select(count, Person.gender_concept_id, Concept.concept_name)
+            .outerjoin(Concept, Concept.concept_id == Person.gender_concept_id)
+            .group_by(Person.gender_concept_id, Concept.concept_name)
+        )
 
         if low_number > 0:
-            stmnt = stmnt.having(func.count(distinct(Person.person_id)) >= low_number)
+            stmnt = stmnt.having(func.count(Person.person_id) >= low_number)
 
         return stmnt
 
-    def _get_concept_data(self) -> Dict[int, str]:
-        """
-        Get concept descriptions for gender concepts.
+    @staticmethod
+    @lru_cache(maxsize=GENDER_QUERY_CACHE_SIZE)
+    def _get_gender_query(
+        rounding: int, low_number: int
+    ) -> Select[Tuple[int, int, str]]:
+        """Get the query for gender distribution, reusing one built for the same modifiers.
+
+        Args:
+            rounding: int
+                The rounding value to be used in the query
+            low_number: int
+                The low number value to be used in the query
 
         Returns:
-            Dict[int, str]: A dictionary of concept IDs and their corresponding names.
+            select: The query for gender distribution.
         """
-        concept_query = select(Concept.concept_id, Concept.concept_name).where(
-            Concept.concept_id.in_(self.GENDER_CONCEPT_IDS)
+        return DemographicsDistributionQuerySolver._build_gender_query(
+            rounding, low_number
         )
-        with self.db_client.engine.connect() as con:
-            concept_result = con.execute(concept_query)
-            return {concept_id: name for concept_id, name in concept_result}
 
     def _build_alternatives_string(
         self,
@@ -182,13 +219,13 @@ class DemographicsDistributionQuerySolver:
         Returns:
             str: The alternatives string for gender distribution.
         """
-        alternatives = "^"
-        for concept_id in self.GENDER_CONCEPT_IDS:
-            if concept_id in counts_by_gender:
-                count = apply_filters(counts_by_gender[concept_id], results_modifier)
-                name = concept_names.get(concept_id, "Unknown")
-                alternatives += f"{name.title()}|{count}^"
-        return alternatives
+        alternatives = "".join(
+            f"{concept_names.get(concept_id, 'Unknown').title()}"
+            f"|{apply_filters(count, results_modifier)}^"
+            for concept_id in self.GENDER_CONCEPT_IDS
+            if (count := counts_by_gender.get(concept_id)) is not None
+        )
+        return f"^{alternatives}"
 
     def _create_demographics_rows(
         self, total_count: int, alternatives: str
@@ -240,11 +277,14 @@ class DemographicsDistributionQuerySolver:
 
         # Get the data
         with self.db_client.engine.connect() as con:
-            stmnt = self._build_gender_query(rounding, low_number)
+            stmnt = self._get_gender_query(rounding, low_number)
             result = con.execute(stmnt)
-            counts_by_gender = {gender_id: count for count, gender_id in result}
-
-            concept_names = self._get_concept_data()
+            counts_by_gender: Dict[int, int] = {}
+            concept_names: Dict[int, str] = {}
+            for count, gender_id, concept_name in result:
+                counts_by_gender[gender_id] = count
+                if concept_name is not None:
+                    concept_names[gender_id] = concept_name
 
         # Calculate total count with suppression
         total_count = apply_filters(sum(counts_by_gender.values()), results_modifier)
@@ -258,11 +298,7 @@ class DemographicsDistributionQuerySolver:
         # Format as tsv
         header = "\t".join(self.output_cols)
         values = [
-            "\t".join(
-                str(row.model_dump(mode="json").get(col.lower(), ""))
-                for col in self.output_cols
-            )
-            for row in rows
+            _ROW_TEMPLATE % tuple(getter(row) for getter in _ROW_ATTRS) for row in rows
         ]
         result_string = f"{header}{os.linesep}{os.linesep.join(values)}"
 
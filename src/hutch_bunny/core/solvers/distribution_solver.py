@@ -1,9 +1,9 @@
 import os
+from functools import lru_cache
 from hutch_bunny.core.logger import logger, INFO
-from typing import Tuple, Type, Union, Sequence
+from typing import Any, Tuple, Type, Union
 
-from sqlalchemy import distinct, func
-from pydantic import BaseModel, Field, ConfigDict
+from sqlalchemy import CompoundSelect, Select, func, literal, union_all
 
 from hutch_bunny.core.obfuscation import apply_filters
 from hutch_bunny.core.db import BaseDBClient
@@ -41,43 +41,11 @@ PersonTable = Union[
 
 settings = Settings()
 
+# Number of rows fetched from the database at a time when reading distribution results
+RESULT_BATCH_SIZE = 10_000
 
-class CodeDistributionRow(BaseModel):
-    """
-    A single row in the distribution output.
-    """
-    biobank: str = Field(alias="BIOBANK")
-    code: str = Field(alias="CODE")
-    count: int = Field(alias="COUNT")  
-    description: str = Field(default="", alias="DESCRIPTION")
-    min_val: str = Field(default="", alias="MIN")
-    q1: str = Field(default="", alias="Q1")
-    median: str = Field(default="", alias="MEDIAN")
-    mean: str = Field(default="", alias="MEAN")
-    q3: str = Field(default="", alias="Q3")
-    max_val: str = Field(default="", alias="MAX")
-    alternatives: str = Field(default="", alias="ALTERNATIVES")
-    dataset: str = Field(default="", alias="DATASET")
-    omop: str = Field(alias="OMOP")
-    omop_descr: str = Field(alias="OMOP_DESCR")
-    category: str = Field(alias="CATEGORY")
-
-    model_config = ConfigDict(populate_by_name=True)
-
-
-def convert_rows_to_tsv(
-    output_cols: list[str],
-    rows: Sequence[BaseModel]
-) -> str:
-    """Convert list of Pydantic models to TSV string."""
-    results = ["\t".join(output_cols)]
-    
-    for row in rows:
-        row_dict = row.model_dump(by_alias=True, mode="json")
-        row_values = [str(row_dict.get(col, "")) for col in output_cols]
-        results.append("\t".join(row_values))
-    
-    return os.linesep.join(results)
+# Maximum number of built distribution queries kept, one per distinct (domains, rounding, low_number)
+DISTRIBUTION_QUERY_CACHE_SIZE = 32
 
 
 class CodeDistributionQuerySolver:
@@ -135,11 +103,121 @@ class CodeDistributionQuerySolver:
         "OMOP_DESCR",
         "CATEGORY",
     ]
+    # One output row: BIOBANK, CODE and COUNT, then DESCRIPTION to DATASET
+    # which are always empty, then OMOP, OMOP_DESCR and CATEGORY
+    row_template = "%s\tOMOP:%s\t%s" + "\t" * 10 + "%s\t%s\t%s"
 
     def __init__(self, db_client: BaseDBClient, query: DistributionQuery) -> None:
         self.db_client = db_client
         self.query = query
 
+    def _get_modifier_values(
+        self, results_modifier: list[ResultModifier]
+    ) -> Tuple[int, int]:
+        """Extract the low number and rounding values from the results modifiers.
+
+        Parameters
+        ----------
+            results_modifier: List
+            A list of modifiers to be applied to the results of the query
+        """
+        # Index the modifiers by id in one pass, keeping the first of any duplicates
+        modifiers = {item["id"]: item for item in reversed(results_modifier)}
+
+        low_number_modifier = modifiers.get("Low Number Suppression")
+        low_number = (
+            low_number_modifier["threshold"]
+            if low_number_modifier is not None and low_number_modifier["threshold"] is not None
+            else 10
+        )
+        rounding_modifier = modifiers.get("Rounding")
+        rounding = (
+            rounding_modifier["nearest"]
+            if rounding_modifier is not None and rounding_modifier["nearest"] is not None
+            else 10
+        )
+        return low_number, rounding
+
+    @classmethod
+    def _build_domain_query(
+        cls, domain_id: str, rounding: int, low_number: int
+    ) -> Select[Tuple[Any, int, str, str]]:
+        """Build the per-concept person count query for a single domain.
+
+        Parameters
+        ----------
+            domain_id: str
+            The domain whose table is counted
+            rounding: int
+            Rounding factor for the counts
+            low_number: int
+            Low number suppression threshold for the counts
+        """
+        # Get table and concept column for this domain
+        table = cls.allowed_domains_map[domain_id]
+        concept_col = cls.domain_concept_id_map[domain_id]
+
+        # Step 1: subquery to count people per concept_id, deduplicating
+        # (concept_id, person_id) pairs with a GROUP BY the planner can
+        # parallelise rather than a COUNT(DISTINCT)
+        person_concepts = (
+            select(concept_col.label("concept_id"), table.person_id)
+            .group_by(concept_col, table.person_id)
+            .subquery()
+        )
+        subq = (
+            select(
+                person_concepts.c.concept_id,
+                func.count(person_concepts.c.person_id).label("count_agg")
+            )
+            .group_by(person_concepts.c.concept_id)
+            .subquery()
+        )
+
+        # Step 2: join with Concept table
+        stmnt = (
+            select(
+                # Apply rounding only here, after the join
+                (func.round(subq.c.count_agg / rounding, 0) * rounding).label("count_agg_rounded")
+                if rounding > 0 else subq.c.count_agg,
+                Concept.concept_id,
+                Concept.concept_name,
+                # Rendered inline so every database can type the unioned column
+                literal(domain_id, literal_execute=True).label("category"),
+            )
+            .join(Concept, subq.c.concept_id == Concept.concept_id)
+        )
+
+        # Step 3: optional low-number filter
+        if low_number > 0:
+            stmnt = stmnt.where(subq.c.count_agg >= low_number)
+
+        return stmnt
+
+    @classmethod
+    @lru_cache(maxsize=DISTRIBUTION_QUERY_CACHE_SIZE)
+    def _get_distribution_query(
+        cls, domain_ids: Tuple[str, ...], rounding: int, low_number: int
+    ) -> CompoundSelect[Tuple[Any, int, str, str]]:
+        """Get the distribution query over the given domains, reusing one built for the same modifiers.
+
+        Parameters
+        ----------
+            domain_ids: Tuple[str, ...]
+            The domains to count, in output order
+            rounding: int
+            Rounding factor for the counts
+            low_number: int
+            Low number suppression threshold for the counts
+        """
+        # One statement covers every domain, so the database is only visited once
+        return union_all(
+            *(
+                cls._build_domain_query(domain_id, rounding, low_number)
+                for domain_id in domain_ids
+            )
+        )
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_fixed(60),
@@ -156,103 +234,34 @@ class CodeDistributionQuerySolver:
             results_modifier: List
             A list of modifiers to be applied to the results of the query before returning them to Relay
         """
-        low_number: int = next(
-            (
-                item["threshold"] if item["threshold"] is not None else 10
-                for item in results_modifier
-                if item["id"] == "Low Number Suppression"
-            ),
-            10,
-        )
-        rounding: int = next(
-            (
-                item["nearest"] if item["nearest"] is not None else 10
-                for item in results_modifier
-                if item["id"] == "Rounding"
-            ),
-            10,
+        low_number, rounding = self._get_modifier_values(results_modifier)
+
+        domain_ids = tuple(
+            domain_id
+            for domain_id in self.allowed_domains_map
+            if settings.OMOP_SPECIMEN_ENABLED or domain_id != "Specimen"
         )
+        stmnt = self._get_distribution_query(domain_ids, rounding, low_number)
 
-        counts: list[int] = []
-        concepts: list[int] = []
-        categories: list[str] = []
-        omop_desc: list[str] = []
+        # Rows arrive in any order; keep the output lines grouped by domain in the map's order
+        lines_by_domain: dict[str, list[str]] = {domain_id: [] for domain_id in domain_ids}
+        biobank = self.query.collection
 
         with self.db_client.engine.connect() as con:
-            for domain_id in self.allowed_domains_map:
-
-                if not settings.OMOP_SPECIMEN_ENABLED and domain_id == "Specimen":
-                    continue
-
-                logger.debug(domain_id)
-
-                # Get table and concept column for this domain
-                table = self.allowed_domains_map[domain_id]
-                concept_col = self.domain_concept_id_map[domain_id]
-
-                # Step 1: subquery to count distinct person_id per concept_id
-                subq = (
-                    select(
-                        concept_col.label("concept_id"),
-                        func.count(distinct(table.person_id)).label("count_agg")
-                    )
-                    .group_by(concept_col)
-                    .subquery()
-                )
-
-                # Step 2: join with Concept table
-                stmnt = (
-                    select(
-                        # Apply rounding only here, after the join
-                        (func.round(subq.c.count_agg / rounding, 0) * rounding).label("count_agg_rounded")
-                        if rounding > 0 else subq.c.count_agg,
-                        Concept.concept_id,
-                        Concept.concept_name
-                    )
-                    .join(Concept, subq.c.concept_id == Concept.concept_id)
+            # Stream the rows in batches, formatting each output line as it is read
+            result = con.execute(stmnt, execution_options={"yield_per": RESULT_BATCH_SIZE})
+            for concept_count, concept_id, concept_name, category in result:
+                # Suppression modifiers applied AFTER the query
+                count = apply_filters(concept_count, results_modifier)
+                lines_by_domain[category].append(
+                    self.row_template
+                    % (biobank, concept_id, count, concept_id, concept_name, category)
                 )
 
-                # Step 3: optional low-number filter
-                if low_number > 0:
-                    stmnt = stmnt.where(subq.c.count_agg >= low_number)
+        log_query(stmnt, self.db_client.engine)
 
-                compiled = stmnt.compile(
-                    dialect=con.engine.dialect,
-                    compile_kwargs={"literal_binds": True}
-                )
-                logger.debug(compiled)
-                # Execute
-                result = con.execute(stmnt)
-                res = result.fetchall()
-
-                for row in res:
-                    counts.append(row[0])
-                    concepts.append(row[1])
-                    omop_desc.append(row[2])
-
-                # Track categories
-                num_results = len(res)
-                categories.extend([domain_id] * num_results)
-
-                log_query(stmnt, self.db_client.engine)
-
-        # Suppression modifiers applied AFTER the query (unchanged)
-        for i in range(len(counts)):
-            counts[i] = apply_filters(counts[i], results_modifier)
-
-        counts = list(map(int, counts))
-
-        rows = [
-            CodeDistributionRow(
-                biobank=self.query.collection,
-                code=f"OMOP:{concepts[i]}",
-                count=counts[i],
-                omop=str(concepts[i]),
-                omop_descr=omop_desc[i],
-                category=categories[i],
-            )
-            for i in range(len(counts))
-        ]
+        lines = ["\t".join(self.output_cols)]
+        for domain_lines in lines_by_domain.values():
+            lines.extend(domain_lines)
 
-        tsv_string = convert_rows_to_tsv(self.output_cols, rows)
-        return tsv_string, len(rows)
+        return os.linesep.join(lines), len(lines) - 1
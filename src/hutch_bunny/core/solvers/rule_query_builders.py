@@ -2,18 +2,23 @@ from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from typing import Any, Callable
 from sqlalchemy.sql.expression import ClauseElement
+from sqlalchemy.sql.functions import Function
 from sqlalchemy import (
+    Column,
     CompoundSelect,
+    Integer,
     Engine,
     or_,
     and_,
+    extract,
     func,
-    BinaryExpression,
     ColumnElement,
     select,
     Select,
+    column,
     text,
-    union,
+    union_all,
+    values,
 )
 from hutch_bunny.core.db import BaseDBClient
 from hutch_bunny.core.db.entities import (
@@ -27,41 +32,67 @@ from hutch_bunny.core.db.entities import (
     Specimen,
 )
 from typing import Tuple
-import operator as op
 
 from hutch_bunny.core.rquest_models.rule import Rule
 from hutch_bunny.core.omop import Varcat
 
 
+# Person columns holding the concept for each person-level OMOP domain
+PERSON_DOMAIN_COLUMNS: dict[str, Column[int]] = {
+    "Gender": Person.gender_concept_id,
+    "Race": Person.race_concept_id,
+    "Ethnicity": Person.ethnicity_concept_id,
+}
+
+
 class SQLDialectHandler:
     """Handles SQL dialect-specific operations for cross-database compatibility."""
 
+    # Function building a date from year, month and day parts on each dialect
+    DATE_FROM_PARTS_FUNCTIONS: dict[str, Callable[..., Function[Any]]] = {
+        "postgresql": func.make_date,
+        "duckdb": func.make_date,
+        "mssql": func.DATEFROMPARTS,
+        "snowflake": func.DATE_FROM_PARTS,
+    }
+
     @staticmethod
     def get_year_difference(
-        engine: Engine, start_date: ClauseElement, year_of_birth: ClauseElement
+        start_date: ColumnElement[Any], year_of_birth: ColumnElement[Any]
     ) -> ColumnElement[int]:
         """
-        Calculate year difference between a date and year of birth using dialect-specific SQL.
+        Calculate year difference between a date and year of birth.
+
+        Uses `EXTRACT(year FROM ...)`, which SQLAlchemy compiles to the right
+        function for each dialect (e.g. `DATEPART` on MSSQL).
 
         Args:
-            engine: SQLAlchemy engine to determine the SQL dialect.
             start_date: Date column to calculate age from.
             year_of_birth: Year of birth column.
 
         Returns:
             SQLAlchemy expression for year difference calculation.
+        """
+        return extract("year", start_date) - year_of_birth
 
-        Raises:
-            NotImplementedError: If the database dialect is not supported.
+    @staticmethod
+    def get_year_start(engine: Engine, year: ColumnElement[int]) -> ColumnElement[Any]:
         """
-        if engine.dialect.name in ["postgresql", "duckdb"]:
-            return func.date_part("year", start_date) - year_of_birth
-        elif engine.dialect.name == "mssql":
-            return func.DATEPART(text("year"), start_date) - year_of_birth
-        elif engine.dialect.name == "snowflake":
-            return func.YEAR(start_date) - year_of_birth
-        else:
+        Return a SQLAlchemy expression for the 1st of January of a given year.
+
+        Args:
+            engine: Engine whose dialect the expression is built for.
+            year: Year expression.
+
+        Returns:
+            SQLAlchemy expression for the date at the start of the year.
+        """
+        date_from_parts = SQLDialectHandler.DATE_FROM_PARTS_FUNCTIONS.get(
+            engine.dialect.name
+        )
+        if date_from_parts is None:
             raise NotImplementedError("Unsupported database dialect")
+        return date_from_parts(year, 1, 1)
 
     @staticmethod
     def get_haversine_distance(
@@ -97,6 +128,12 @@ class SQLDialectHandler:
             raise NotImplementedError("Unsupported database dialect")
 
 
+# A person's age in years as of today; built once as it does not depend on the rule
+CURRENT_AGE: ColumnElement[int] = SQLDialectHandler.get_year_difference(
+    func.current_timestamp(), Person.year_of_birth
+)
+
+
 class OMOPRuleQueryBuilder:
     """
     Builder for constructing OMOP CDM queries from RQuest availability rules.
@@ -110,6 +147,8 @@ class OMOPRuleQueryBuilder:
     using UNION operations to find all persons matching the specified criteria,
     guarding against vocabulary drift between the querying party and the local
     CDM. Specimen is unioned in too whenever `include_specimen` is enabled.
+    When the concept's `domain` in the local vocabulary is known, only the table
+    for that domain is queried.
 
     Location is the one exception: it has no equivalent per-person clinical
     event table to union with the others, so a `varcat` of `Location` bypasses
@@ -117,30 +156,74 @@ class OMOPRuleQueryBuilder:
     through `person.location_id`.
     """
 
+    # Query attribute, person_id column and event date column of each table with an age-at-event
+    AGE_EVENT_COLUMNS: tuple[tuple[str, Column[int], Column[Any]], ...] = (
+        (
+            "condition_query",
+            ConditionOccurrence.person_id,
+            ConditionOccurrence.condition_start_date,
+        ),
+        ("drug_query", DrugExposure.person_id, DrugExposure.drug_exposure_start_date),
+        ("measurement_query", Measurement.person_id, Measurement.measurement_date),
+        ("observation_query", Observation.person_id, Observation.observation_date),
+        (
+            "procedure_query",
+            ProcedureOccurrence.person_id,
+            ProcedureOccurrence.procedure_date,
+        ),
+        ("specimen_query", Specimen.person_id, Specimen.specimen_date),
+    )
+
+    # Query attribute and concept column of each clinical event table
+    CONCEPT_COLUMNS: tuple[tuple[str, Column[int]], ...] = (
+        ("condition_query", ConditionOccurrence.condition_concept_id),
+        ("drug_query", DrugExposure.drug_concept_id),
+        ("measurement_query", Measurement.measurement_concept_id),
+        ("observation_query", Observation.observation_concept_id),
+        ("procedure_query", ProcedureOccurrence.procedure_concept_id),
+        ("specimen_query", Specimen.specimen_concept_id),
+    )
+
+    # Concept sets larger than this are joined as a VALUES table rather than an IN list
+    CONCEPT_SET_JOIN_THRESHOLD = 50
+
+    # Unconstrained query of each table; statements are immutable, so every builder starts from these
+    BASE_CONDITION_QUERY: Select[Tuple[int]] = select(ConditionOccurrence.person_id)
+    BASE_DRUG_QUERY: Select[Tuple[int]] = select(DrugExposure.person_id)
+    BASE_MEASUREMENT_QUERY: Select[Tuple[int]] = select(Measurement.person_id)
+    BASE_OBSERVATION_QUERY: Select[Tuple[int]] = select(Observation.person_id)
+    BASE_PROCEDURE_QUERY: Select[Tuple[int]] = select(ProcedureOccurrence.person_id)
+    BASE_SPECIMEN_QUERY: Select[Tuple[int]] = select(Specimen.person_id)
+    BASE_LOCATION_QUERY: Select[Tuple[int]] = select(Person.person_id).join(
+        Location, Person.location_id == Location.location_id
+    )
+
     def __init__(
         self,
         db_client: BaseDBClient,
         varcat: Varcat | None = None,
         include_specimen: bool = False,
         include_location: bool = False,
+        domain: str | None = None,
+        reference_date: datetime | None = None,
     ):
         self.db_client = db_client
+        self.domain = domain
+        self.reference_date = reference_date
         self.include_specimen = include_specimen
         self.include_location = include_location
         self.is_location_rule = varcat == Varcat.LOCATION
 
-        self.condition_query: Select[Tuple[int]] = select(ConditionOccurrence.person_id)
-        self.drug_query: Select[Tuple[int]] = select(DrugExposure.person_id)
-        self.measurement_query: Select[Tuple[int]] = select(Measurement.person_id)
-        self.observation_query: Select[Tuple[int]] = select(Observation.person_id)
-        self.procedure_query: Select[Tuple[int]] = select(ProcedureOccurrence.person_id)
+        self.condition_query: Select[Tuple[int]] = self.BASE_CONDITION_QUERY
+        self.drug_query: Select[Tuple[int]] = self.BASE_DRUG_QUERY
+        self.measurement_query: Select[Tuple[int]] = self.BASE_MEASUREMENT_QUERY
+        self.observation_query: Select[Tuple[int]] = self.BASE_OBSERVATION_QUERY
+        self.procedure_query: Select[Tuple[int]] = self.BASE_PROCEDURE_QUERY
         self.specimen_query: Select[Tuple[int]] | None = (
-            select(Specimen.person_id) if include_specimen else None
+            self.BASE_SPECIMEN_QUERY if include_specimen else None
         )
         self.location_query: Select[Tuple[int]] | None = (
-            select(Person.person_id).join(
-                Location, Person.location_id == Location.location_id
-            )
+            self.BASE_LOCATION_QUERY
             if self.is_location_rule and include_location
             else None
         )
@@ -179,6 +262,44 @@ class OMOPRuleQueryBuilder:
             )
         return self
 
+    def add_concept_set_constraint(
+        self, concept_ids: list[int]
+    ) -> "OMOPRuleQueryBuilder":
+        """
+        Add constraints matching any of several OMOP concept IDs across all tables.
+
+        Equivalent to the UNION of one `add_concept_constraint` query per concept,
+        but scans each table once. Large concept sets are joined as a VALUES table
+        instead of an IN list so the planner can drive the lookup from the concept index.
+
+        Args:
+            concept_ids: OMOP concept identifiers to filter by.
+
+        Returns:
+            Self for method chaining.
+        """
+        unique_concept_ids = list(dict.fromkeys(concept_ids))
+        concept_set = (
+            values(column("concept_id", Integer), name="concept_set").data(
+                [(concept_id,) for concept_id in unique_concept_ids]
+            )
+            if len(unique_concept_ids) > self.CONCEPT_SET_JOIN_THRESHOLD
+            else None
+        )
+
+        for query_attr, concept_column in self.CONCEPT_COLUMNS:
+            table_query = getattr(self, query_attr)
+            if table_query is None:
+                continue
+            if concept_set is not None:
+                table_query = table_query.join(
+                    concept_set, concept_column == concept_set.c.concept_id
+                )
+            else:
+                table_query = table_query.where(concept_column.in_(unique_concept_ids))
+            setattr(self, query_attr, table_query)
+        return self
+
     def add_age_constraint(
         self, greater_than_value: str | None, less_than_value: str | None
     ) -> "OMOPRuleQueryBuilder":
@@ -190,10 +311,12 @@ class OMOPRuleQueryBuilder:
 
         If the `|` is on the left of the value it was less than or equal the number.
         If the `|` is on the right of the value it was greater than or equal the number.
+        If both boundaries are given, the age must fall within the inclusive range.
 
         For example:
         - 10|:AGE:Y (greater than or equal to 10 years) - greater_than_value will be 10 and less_than_value None
         - |10:AGE:Y (less than or equal to 10 years) - greater_than_value will be None and less_than_value 10
+        - 10|20:AGE:Y (between 10 and 20 years) - greater_than_value will be 10 and less_than_value 20
 
         Args:
             greater_than_value (str | None): Lower age bound as a string, or None if not specified.
@@ -205,71 +328,61 @@ class OMOPRuleQueryBuilder:
         if not greater_than_value and not less_than_value:
             return self
 
-        if less_than_value:
-            comparator = op.le
-            age_value = int(less_than_value)
-        elif greater_than_value:
-            comparator = op.ge
-            age_value = int(greater_than_value)
-        else:
-            # Both values present - this would be a range
-            # Currently we instead apply lower and upper constraints independently
-            raise ValueError(
-                f"Age constraint with both boundaries not implemented: {greater_than_value}|{less_than_value}"
-            )
+        min_age = int(greater_than_value) if greater_than_value else None
+        max_age = int(less_than_value) if less_than_value else None
+        # Every table compares against the same dates, so resolve the dialect once
+        date_bounds = self._get_age_date_bounds(min_age, max_age)
+
+        for query_attr, table_person_id, table_date_column in self.AGE_EVENT_COLUMNS:
+            table_query = getattr(self, query_attr)
+            if table_query is not None:
+                setattr(
+                    self,
+                    query_attr,
+                    self._apply_age_constraint_to_table(
+                        table_query, table_person_id, table_date_column, min_age, max_age, date_bounds
+                    ),
+                )
+        return self
 
-        self.condition_query = self._apply_age_constraint_to_table(
-            self.condition_query,
-            ConditionOccurrence.person_id,
-            ConditionOccurrence.condition_start_date,
-            comparator,
-            age_value,
-        )
-        self.drug_query = self._apply_age_constraint_to_table(
-            self.drug_query,
-            DrugExposure.person_id,
-            DrugExposure.drug_exposure_start_date,
-            comparator,
-            age_value,
-        )
-        self.measurement_query = self._apply_age_constraint_to_table(
-            self.measurement_query,
-            Measurement.person_id,
-            Measurement.measurement_date,
-            comparator,
-            age_value,
-        )
-        self.observation_query = self._apply_age_constraint_to_table(
-            self.observation_query,
-            Observation.person_id,
-            Observation.observation_date,
-            comparator,
-            age_value,
-        )
-        self.procedure_query = self._apply_age_constraint_to_table(
-            self.procedure_query,
-            ProcedureOccurrence.person_id,
-            ProcedureOccurrence.procedure_date,
-            comparator,
-            age_value,
+    def _get_age_date_bounds(
+        self, min_age: int | None, max_age: int | None
+    ) -> tuple[ColumnElement[Any] | None, ColumnElement[Any] | None] | None:
+        """
+        Build the event date bounds equivalent to an age range.
+
+        The bounds are the start of the years the age bounds fall in, so comparing an
+        event date against them matches the year difference.
+
+        Args:
+            min_age: The minimum age at the event, or None for no lower bound.
+            max_age: The maximum age at the event, or None for no upper bound.
+
+        Returns:
+            The inclusive lower and exclusive upper date bounds, or None if the
+            dialect cannot build dates.
+        """
+        engine = self.db_client.engine
+        if engine.dialect.name not in SQLDialectHandler.DATE_FROM_PARTS_FUNCTIONS:
+            return None
+
+        return (
+            SQLDialectHandler.get_year_start(engine, Person.year_of_birth + min_age)
+            if min_age is not None
+            else None,
+            SQLDialectHandler.get_year_start(engine, Person.year_of_birth + (max_age + 1))
+            if max_age is not None
+            else None,
         )
-        if self.specimen_query is not None:
-            self.specimen_query = self._apply_age_constraint_to_table(
-                self.specimen_query,
-                Specimen.person_id,
-                Specimen.specimen_date,
-                comparator,
-                age_value,
-            )
-        return self
 
     def _apply_age_constraint_to_table(
         self,
         table_query: Select[Tuple[int]],
         table_person_id: ClauseElement,
-        table_date_column: ClauseElement,
-        operator_func: Callable[[Any, Any], BinaryExpression[bool]],
-        age_value: int,
+        table_date_column: ColumnElement[Any],
+        min_age: int | None,
+        max_age: int | None,
+        date_bounds: tuple[ColumnElement[Any] | None, ColumnElement[Any] | None] | None = None,
     ) -> Select[Tuple[int]]:
         """
         Helper method to apply age constraints to a table query.
@@ -278,17 +391,37 @@ class OMOPRuleQueryBuilder:
             table_query: The table query to apply the age constraint to.
             table_person_id: The person_id column in the table.
             table_date_column: The date column in the table.
-            operator_func: The operator function to use in the constraint.
-            age_value: The age value to use in the constraint.
+            min_age: The minimum age at the event, or None for no lower bound.
+            max_age: The maximum age at the event, or None for no upper bound.
+            date_bounds: Event date bounds equivalent to the age range, or None to
+                compare the year difference instead.
 
         Returns:
             The table query with the age constraint applied.
         """
-        age_difference = SQLDialectHandler.get_year_difference(
-            self.db_client.engine, table_date_column, Person.year_of_birth
-        )
+        constraint: ColumnElement[bool]
+
+        if date_bounds is not None:
+            # Leave the date column bare so an index on it stays usable
+            lower_bound, upper_bound = date_bounds
+            bounds: list[ColumnElement[bool]] = []
+            if lower_bound is not None:
+                bounds.append(table_date_column >= lower_bound)
+            if upper_bound is not None:
+                bounds.append(table_date_column < upper_bound)
+            constraint = and_(*bounds)
+        else:
+            age_difference = SQLDialectHandler.get_year_difference(
+                table_date_column, Person.year_of_birth
+            )
 
-        constraint = operator_func(age_difference, age_value)
+            # Both bounds make a single range predicate
+            if min_age is not None and max_age is not None:
+                constraint = age_difference.between(min_age, max_age)
+            elif min_age is not None:
+                constraint = age_difference >= min_age
+            else:
+                constraint = age_difference <= max_age
 
         # Use JOIN instead of EXISTS for better performance
         return table_query.join(Person, Person.person_id == table_person_id).where(
@@ -352,7 +485,8 @@ class OMOPRuleQueryBuilder:
 
         time_to_use = int(time_value_supplied) * -1
 
-        today_date = datetime.now()
+        # Rules of the same query share one "now" so they agree on the relative date
+        today_date = self.reference_date or datetime.now()
 
         relative_date = today_date + relativedelta(months=time_to_use)
 
@@ -513,11 +647,14 @@ class OMOPRuleQueryBuilder:
 
     def build(self) -> CompoundSelect:
         """
-        Combine all table queries into a single UNION query.
+        Combine all table queries into a single UNION ALL query.
 
-        Creates a UNION of person_id selections from all four OMOP tables
+        Creates a UNION ALL of person_id selections from all four OMOP tables
         (measurement, observation, condition, drug) with all applied constraints.
-        This returns all unique person_ids that match the criteria in any table.
+        This returns all person_ids that match the criteria in any table.
+
+        If the concept's domain is known, only the query for that domain's
+        table is returned.
 
         For a `Location` rule, this instead returns just the location query
         (or a stub that contributes no matches, if `OMOP_LOCATION_ENABLED` is
@@ -527,26 +664,42 @@ class OMOPRuleQueryBuilder:
             CompoundSelect query that unions results from all tables.
 
         Note:
-            The UNION operation automatically deduplicates person_ids that
-            appear in multiple tables.
+            Each table's person_ids are grouped before the union, so a person with
+            many matching events contributes one row per table. person_ids that
+            appear in multiple tables are not deduplicated across tables; the group
+            and cohort set operations that consume this query do that once.
         """
         if self.is_location_rule:
             if self.location_query is not None:
-                return union(self.location_query)
+                return union_all(self.location_query)
             # OMOP_LOCATION_ENABLED is off - contribute no matches.
-            return union(select(Person.person_id).where(text("1=0")))
-
-        queries: list[Select[Tuple[int]]] = [
-            self.measurement_query,
-            self.observation_query,
-            self.condition_query,
-            self.drug_query,
-            self.procedure_query,
+            return union_all(select(Person.person_id).where(text("1=0")))
+
+        domain_queries: dict[str, Select[Tuple[int]] | None] = {
+            "Measurement": self.measurement_query,
+            "Observation": self.observation_query,
+            "Condition": self.condition_query,
+            "Drug": self.drug_query,
+            "Procedure": self.procedure_query,
+            "Specimen": self.specimen_query,
+        }
+
+        # The local vocabulary places the concept in a single table
+        domain_query = domain_queries.get(self.domain) if self.domain else None
+        if domain_query is not None:
+            return union_all(self._group_by_person(domain_query))
+
+        queries = [
+            self._group_by_person(query)
+            for query in domain_queries.values()
+            if query is not None
         ]
-        if self.specimen_query is not None:
-            queries.append(self.specimen_query)
+        return union_all(*queries)
 
-        return union(*queries)
+    @staticmethod
+    def _group_by_person(query: Select[Tuple[int]]) -> Select[Tuple[int]]:
+        """Collapse a table query's matching events to one row per person."""
+        return query.group_by(*query.selected_columns)
 
 
 class PersonConstraintBuilder:
@@ -590,14 +743,11 @@ class PersonConstraintBuilder:
             return self._build_age_constraints(rule)
 
         concept_domain = concepts.get(rule.value)
+        column = PERSON_DOMAIN_COLUMNS.get(concept_domain) if concept_domain else None
 
-        if concept_domain == "Gender":
-            return self._build_gender_constraint(rule, self._build_age_constraint(rule))
-        elif concept_domain == "Race":
-            return self._build_race_constraint(rule, self._build_age_constraint(rule))
-        elif concept_domain == "Ethnicity":
-            return self._build_ethnicity_constraint(
-                rule, self._build_age_constraint(rule)
+        if column is not None:
+            return self._build_domain_constraint(
+                column, rule, self._build_age_constraint(rule)
             )
 
         return []
@@ -618,76 +768,35 @@ class PersonConstraintBuilder:
         if rule.min_value is None or rule.max_value is None:
             return []
 
-        age = SQLDialectHandler.get_year_difference(
-            self.db_client.engine, func.current_timestamp(), Person.year_of_birth
-        )
+        age = CURRENT_AGE
         return [and_(age >= rule.min_value, age <= rule.max_value)]
 
     def _build_age_constraint(self, rule: Rule) -> list[ColumnElement[bool]]:
         """Build a dynamic age constraint with comparator."""
 
-        # If neither value is provided, return an empty list (no constraint)
-        if rule.greater_than_value is None and rule.less_than_value is None:
-            return []
-
-        comparator: Callable[[int, int], bool] | None = None
-
-        age_value: int = 0
-
-        # Determine comparator and age_value based on which side is set
-        if rule.greater_than_value is not None and rule.greater_than_value != "":
-            comparator = op.ge  # age >= greater_than_value
-            age_value = int(rule.greater_than_value)
-        elif rule.less_than_value is not None and rule.less_than_value != "":
-            comparator = op.le  # age <=less_than_value
-            age_value = int(rule.less_than_value)
-
         # Compute age
         current_year = datetime.now().year
         age = current_year - Person.year_of_birth
 
-        # Build numeric constraint using the comparator
-        numeric_constraint = comparator(age, age_value)
-
-        return [numeric_constraint]
-
-    def _build_gender_constraint(
-        self, rule: Rule, age_constraints: list[ColumnElement[bool]]
-    ) -> list[ColumnElement[bool]]:
-        """Build gender constraint, optionally combining with an age constraint."""
-
-        # Base gender filter
-        gender_constraint = Person.gender_concept_id == int(rule.value)
-
-        # Combine gender + age
-        if age_constraints:
-            combined_constraint = and_(gender_constraint, *age_constraints)
-        else:
-            combined_constraint = gender_constraint
-
-        return [combined_constraint if rule.operator == "=" else ~combined_constraint]
-
-    def _build_race_constraint(
-        self, rule: Rule, age_constraints: list[ColumnElement[bool]]
-    ) -> list[ColumnElement[bool]]:
-        """Build race constraint."""
-        constraint = Person.race_concept_id == int(rule.value)
-
-        # Combine gender + age
-        if age_constraints:
-            combined_constraint = and_(constraint, *age_constraints)
-        else:
-            combined_constraint = constraint
+        # Compare directly against whichever side is set, the lower bound taking precedence
+        if rule.greater_than_value:
+            return [age >= int(rule.greater_than_value)]  # age >= greater_than_value
+        if rule.less_than_value:
+            return [age <= int(rule.less_than_value)]  # age <= less_than_value
 
-        return [combined_constraint if rule.operator == "=" else ~combined_constraint]
+        # If neither value is provided, return an empty list (no constraint)
+        return []
 
-    def _build_ethnicity_constraint(
-        self, rule: Rule, age_constraints: list[ColumnElement[bool]]
+    def _build_domain_constraint(
+        self,
+        column: Column[int],
+        rule: Rule,
+        age_constraints: list[ColumnElement[bool]],
     ) -> list[ColumnElement[bool]]:
-        """Build ethnicity constraint."""
-        constraint = Person.ethnicity_concept_id == int(rule.value)
+        """Build a Person concept constraint, optionally combining with an age constraint."""
+        constraint = column == int(rule.value)
 
-        # Combine gender + age
+        # Combine concept + age
         if age_constraints:
             combined_constraint = and_(constraint, *age_constraints)
         else:
@@ -0,0 +1,407 @@
+import pytest
+from datetime import date
+from pathlib import Path
+from unittest.mock import Mock
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateTable
+
+from hutch_bunny.core.db.entities import Base, Concept, ConditionOccurrence, Person
+from hutch_bunny.core.rquest_models.availability import AvailabilityQuery
+from hutch_bunny.core.solvers.availability_solver import AvailabilitySolver
+
+
+def make_query(rules: list[dict[str, str]]) -> AvailabilityQuery:
+    """Create an availability query with a single group of rules."""
+    return make_cohort_query([rules], "OR")
+
+
+def make_cohort_query(groups: list[list[dict[str, str]]], groups_operator: str) -> AvailabilityQuery:
+    """Create an availability query with one AND group per list of rules."""
+    return AvailabilityQuery.model_validate(
+        {
+            "cohort": {
+                "groups": [{"rules": rules, "rules_oper": "AND"} for rules in groups],
+                "groups_oper": groups_operator,
+            },
+            "uuid": "test_uuid",
+            "owner": "user1",
+            "collection": "test_collection",
+            "protocol_version": "v2",
+            "char_salt": "salt",
+        }
+    )
+
+
+@pytest.fixture
+def mock_db_client() -> Mock:
+    """Create a mock database client."""
+    db_client = Mock()
+    db_client.engine.url = "duckdb:///test.db"
+    return db_client
+
+
+@pytest.fixture
+def duckdb_client(tmp_path: Path) -> Mock:
+    """Create a database client over a small OMOP DuckDB database.
+
+    People 1-12 have condition 1000 and people 7-20 have condition 2000.
+    """
+    db_client = Mock()
+    # Each test gets its own database file, so cached queries are never shared between tests
+    db_client.engine = create_engine(f"duckdb:///{tmp_path / 'omop.duckdb'}")
+    with db_client.engine.begin() as con:
+        for table in Base.metadata.sorted_tables:
+            # The SQLite DDL declares integer keys without SERIAL, which DuckDB lacks
+            con.execute(text(str(CreateTable(table).compile(dialect=sqlite.dialect()))))
+        con.execute(
+            insert(Concept),
+            [
+                {
+                    "concept_id": concept_id,
+                    "concept_name": f"Concept {concept_id}",
+                    "domain_id": domain_id,
+                    "vocabulary_id": "Test",
+                    "concept_class_id": "Test",
+                    "concept_code": str(concept_id),
+                    "valid_start_date": date(1970, 1, 1),
+                    "valid_end_date": date(2099, 12, 31),
+                }
+                for concept_id, domain_id in (
+                    (0, "Metadata"), (8507, "Gender"), (1000, "Condition"), (2000, "Condition")
+                )
+            ],
+        )
+        con.execute(
+            insert(Person),
+            [
+                {
+                    "person_id": person_id,
+                    "gender_concept_id": 8507,
+                    "year_of_birth": 1980,
+                    "race_concept_id": 0,
+                    "ethnicity_concept_id": 0,
+                }
+                for person_id in range(1, 21)
+            ],
+        )
+        con.execute(
+            insert(ConditionOccurrence),
+            [
+                {
+                    "condition_occurrence_id": index,
+                    "person_id": person_id,
+                    "condition_concept_id": concept_id,
+                    "condition_start_date": date(2020, 1, 1),
+                    "condition_type_concept_id": 0,
+                }
+                for index, (person_id, concept_id) in enumerate(
+                    [(person_id, 1000) for person_id in range(1, 13)]
+                    + [(person_id, 2000) for person_id in range(7, 21)]
+                )
+            ],
+        )
+    return db_client
+
+
+# Report exact counts, without rounding or low number suppression
+EXACT_COUNT_MODIFIERS = [
+    {"id": "Low Number Suppression", "threshold": 0},
+    {"id": "Rounding", "nearest": 0},
+]
+
+
+def condition_rule(value: str) -> dict[str, str]:
+    return {"varname": "OMOP", "varcat": "Condition", "type": "TEXT", "oper": "=", "value": value}
+
+
+def test_final_query_cache_key_matches_identical_cohorts(mock_db_client: Mock) -> None:
+    """Test identical cohorts share a final query cache key."""
+    # Arrange
+    first = AvailabilitySolver(mock_db_client, make_query([condition_rule("260139")]))
+    second = AvailabilitySolver(mock_db_client, make_query([condition_rule("260139")]))
+    concepts = {"260139": "Condition"}
+
+    # Act
+    first_key = first._final_query_cache_key(concepts, 10, 10)
+    second_key = second._final_query_cache_key(concepts, 10, 10)
+
+    # Assert
+    assert first_key is not None
+    assert first_key == second_key
+
+
+def test_final_query_cache_key_differs_by_value_and_modifiers(mock_db_client: Mock) -> None:
+    """Test rule values and result modifiers are part of the cache key."""
+    # Arrange
+    first = AvailabilitySolver(mock_db_client, make_query([condition_rule("260139")]))
+    second = AvailabilitySolver(mock_db_client, make_query([condition_rule("4229440")]))
+    concepts = {"260139": "Condition", "4229440": "Condition"}
+
+    # Act
+    key = first._final_query_cache_key(concepts, 10, 10)
+
+    # Assert
+    assert key != second._final_query_cache_key(concepts, 10, 10)
+    assert key != first._final_query_cache_key(concepts, 0, 10)
+    assert key != first._final_query_cache_key(concepts, 10, 0)
+
+
+def test_final_query_cache_key_skips_time_rules(mock_db_client: Mock) -> None:
+    """Test cohorts with TIME rules are not cached."""
+    # Arrange
+    rule = condition_rule("260139") | {"time": "|1:TIME:M"}
+    solver = AvailabilitySolver(mock_db_client, make_query([rule]))
+
+    # Act
+    key = solver._final_query_cache_key({"260139": "Condition"}, 10, 10)
+
+    # Assert
+    assert key is None
+
+
+def test_find_concepts_reuses_cached_domains(mock_db_client: Mock) -> None:
+    """Test concept domains, including unknown concepts, are only looked up once."""
+    # Arrange
+    query = make_query([condition_rule("91000001"), condition_rule("91000002")])
+    solver = AvailabilitySolver(mock_db_client, query)
+    con = Mock()
+    con.execute.return_value = [(91000001, "Condition")]
+
+    # Act
+    first = solver._find_concepts(con, query.cohort.groups)
+    second = solver._find_concepts(con, query.cohort.groups)
+
+    # Assert
+    assert first == {"91000001": "Condition"}
+    assert second == first
+    con.execute.assert_called_once()
+
+
+def test_extract_modifier(mock_db_client: Mock) -> None:
+    """Test _extract_modifier returns configured values and falls back to defaults."""
+    # Arrange
+    solver = AvailabilitySolver(mock_db_client, make_query([condition_rule("260139")]))
+    modifiers = [
+        {"id": "Low Number Suppression", "threshold": 5, "nearest": None},
+        {"id": "Rounding", "threshold": None, "nearest": None},
+    ]
+
+    # Act
+    low_number = solver._extract_modifier(modifiers, "Low Number Suppression", "threshold", 10)  # type: ignore
+    rounding = solver._extract_modifier(modifiers, "Rounding", "nearest", 10)  # type: ignore
+    other_rounding = solver._extract_modifier([], "Rounding", "nearest", 10)
+
+    # Assert
+    assert low_number == 5
+    assert rounding == 10
+    assert other_rounding == 10
+
+
+def test_build_group_query_batches_concept_only_or_rules(mock_db_client: Mock) -> None:
+    """Test concept-only rules in an OR group are matched with a single IN per table."""
+    # Arrange
+    query = make_query([condition_rule("260139"), condition_rule("4229440")])
+    group = query.cohort.groups[0].model_copy(update={"rules_operator": "OR"})
+    solver = AvailabilitySolver(mock_db_client, query)
+
+    # Act
+    group_query = solver._build_group_query(group, {})
+
+    # Assert
+    sql_str = str(group_query.compile(compile_kwargs={"literal_binds": True}))
+    assert "condition_occurrence.condition_concept_id IN (260139, 4229440)" in sql_str
+    assert sql_str.count("FROM condition_occurrence") == 1
+
+
+def test_group_query_cache_key_shared_across_cohorts(mock_db_client: Mock) -> None:
+    """Test a group shared by two cohorts has the same group query cache key."""
+    # Arrange
+    first = AvailabilitySolver(mock_db_client, make_query([condition_rule("260139")]))
+    second = AvailabilitySolver(mock_db_client, make_query([condition_rule("260139")]))
+    concepts = {"260139": "Condition"}
+
+    # Act
+    first_key = first._group_query_cache_key(first.query.cohort.groups[0], concepts)
+    second_key = second._group_query_cache_key(second.query.cohort.groups[0], concepts)
+    time_key = first._group_query_cache_key(
+        make_query([condition_rule("260139") | {"time": "|1:TIME:M"}]).cohort.groups[0],
+        concepts,
+    )
+
+    # Assert
+    assert first_key is not None
+    assert first_key == second_key
+    assert time_key is None
+
+
+def test_is_unconstrained_group(mock_db_client: Mock) -> None:
+    """Test only groups whose Person rules produce no constraint are unconstrained."""
+    # Arrange
+    unknown_person = {"varname": "OMOP", "varcat": "Person", "type": "TEXT", "oper": "=", "value": "1"}
+    gender = unknown_person | {"value": "8507"}
+    solver = AvailabilitySolver(mock_db_client, make_query([unknown_person]))
+    concepts = {"8507": "Gender"}
+
+    # Act
+    unconstrained = solver._is_unconstrained_group(make_query([unknown_person]).cohort.groups[0], concepts)
+    gender_group = solver._is_unconstrained_group(make_query([gender]).cohort.groups[0], concepts)
+    condition_group = solver._is_unconstrained_group(
+        make_query([unknown_person, condition_rule("260139")]).cohort.groups[0], concepts
+    )
+
+    # Assert
+    assert unconstrained is True
+    assert gender_group is False
+    assert condition_group is False
+
+
+def test_build_cached_rule_query_reuses_equivalent_rules(mock_db_client: Mock) -> None:
+    """Test rules searching for the same thing share one built query."""
+    # Arrange
+    first = condition_rule("91000003") | {"time": "10|:AGE:Y"}
+    second = condition_rule("91000003") | {"time": "10:AGE:Y"}
+    query = make_query([first, second])
+    solver = AvailabilitySolver(mock_db_client, query)
+
+    # Act
+    first_query = solver._build_cached_rule_query(query.cohort.groups[0].rules[0])
+    second_query = solver._build_cached_rule_query(query.cohort.groups[0].rules[1])
+
+    # Assert
+    assert first_query is second_query
+
+
+def test_final_query_statement_cache_key_ignores_values(mock_db_client: Mock) -> None:
+    """Test cohorts differing only in values compile to the same cached statement."""
+    # Arrange
+    queries = [
+        make_query([condition_rule(value) | {"time": time}, condition_rule(value) | {"oper": "!="}])
+        for value, time in (("260139", "10|:AGE:Y"), ("4229440", "20|:AGE:Y"))
+    ]
+    solvers = [AvailabilitySolver(mock_db_client, query) for query in queries]
+
+    # Act
+    cache_keys = [
+        solver._construct_final_query(
+            [solver._build_group_query(solver.query.cohort.groups[0], {})], 10, 10
+        )._generate_cache_key()
+        for solver in solvers
+    ]
+
+    # Assert
+    assert cache_keys[0] is not None
+    assert cache_keys[0] == cache_keys[1]
+
+
+def test_solve_query_short_circuits_cohort_without_rules(mock_db_client: Mock) -> None:
+    """Test a cohort with no rules returns an empty count without touching the database."""
+    # Arrange
+    solver = AvailabilitySolver(mock_db_client, make_query([]))
+
+    # Act
+    count = solver.solve_query([])
+
+    # Assert
+    assert count == 0
+    mock_db_client.engine.connect.assert_not_called()
+
+
+def test_solve_query_or_with_empty_group_matches_everyone(duckdb_client: Mock) -> None:
+    """Test a group without rules matches everyone, so an OR cohort including it does too."""
+    # Arrange
+    query = make_cohort_query([[], [condition_rule("1000")]], "OR")
+
+    # Act
+    count = AvailabilitySolver(duckdb_client, query).solve_query(EXACT_COUNT_MODIFIERS)  # type: ignore
+
+    # Assert
+    assert count == 20
+
+
+def test_solve_query_and_with_empty_group_ignores_it(duckdb_client: Mock) -> None:
+    """Test a group without rules adds nothing to an AND cohort."""
+    # Arrange
+    query = make_cohort_query([[], [condition_rule("1000")]], "AND")
+
+    # Act
+    count = AvailabilitySolver(duckdb_client, query).solve_query(EXACT_COUNT_MODIFIERS)  # type: ignore
+
+    # Assert
+    assert count == 12
+
+
+@pytest.mark.parametrize("groups_operator", ["AND", "OR"])
+def test_construct_final_query_tags_groups_in_one_union(
+    mock_db_client: Mock, groups_operator: str
+) -> None:
+    """Test every group is tagged with a marker and combined in a single UNION ALL."""
+    # Arrange
+    query = make_cohort_query(
+        [[condition_rule("260139")], [condition_rule("4229440")], [condition_rule("201826")]],
+        groups_operator,
+    )
+    solver = AvailabilitySolver(mock_db_client, query)
+    group_queries = [solver._build_group_query(group, {}) for group in query.cohort.groups]
+
+    # Act
+    final_query = solver._construct_final_query(group_queries, 0, 0)
+
+    # Assert
+    sql_str = str(final_query.compile(compile_kwargs={"literal_binds": True}))
+    for i in range(3):
+        assert f"FROM final_group_{i}" in sql_str
+        assert f"{i} AS group_marker" in sql_str
+    assert "GROUP BY tagged_members.person_id" in sql_str
+    assert "INTERSECT" not in sql_str
+
+
+def test_construct_final_query_and_requires_every_group(mock_db_client: Mock) -> None:
+    """Test AND between groups keeps only people found under every group marker."""
+    # Arrange
+    query = make_cohort_query([[condition_rule("260139")], [condition_rule("4229440")]], "AND")
+    solver = AvailabilitySolver(mock_db_client, query)
+    group_queries = [solver._build_group_query(group, {}) for group in query.cohort.groups]
+
+    # Act
+    final_query = solver._construct_final_query(group_queries, 0, 0)
+
+    # Assert
+    sql_str = str(final_query.compile(compile_kwargs={"literal_binds": True}))
+    assert sql_str.count("HAVING") == 1
+    for i in range(2):
+        assert (
+            f"sum(CASE WHEN (tagged_members.group_marker = {i}) THEN 1 ELSE 0 END) >= 1"
+            in sql_str
+        )
+
+
+def test_construct_final_query_or_has_no_having(mock_db_client: Mock) -> None:
+    """Test OR between groups counts every tagged person without a HAVING clause."""
+    # Arrange
+    query = make_cohort_query([[condition_rule("260139")], [condition_rule("4229440")]], "OR")
+    solver = AvailabilitySolver(mock_db_client, query)
+    group_queries = [solver._build_group_query(group, {}) for group in query.cohort.groups]
+
+    # Act
+    final_query = solver._construct_final_query(group_queries, 0, 0)
+
+    # Assert
+    sql_str = str(final_query.compile(compile_kwargs={"literal_binds": True}))
+    assert "HAVING" not in sql_str
+    assert "group_marker =" not in sql_str
+
+
+@pytest.mark.parametrize(("groups_operator", "expected"), [("AND", 6), ("OR", 20)])
+def test_solve_query_combines_groups(
+    duckdb_client: Mock, groups_operator: str, expected: int
+) -> None:
+    """Test groups combine to the intersection (AND) or union (OR) of their members."""
+    # Arrange
+    query = make_cohort_query([[condition_rule("1000")], [condition_rule("2000")]], groups_operator)
+
+    # Act
+    count = AvailabilitySolver(duckdb_client, query).solve_query(EXACT_COUNT_MODIFIERS)  # type: ignore
+
+    # Assert
+    assert count == expected
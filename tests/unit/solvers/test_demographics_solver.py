@@ -6,6 +6,7 @@ from hutch_bunny.core.solvers.availability_solver import ResultModifier
 from hutch_bunny.core.solvers.demographics_solver import (
     DemographicsDistributionQuerySolver,
     DemographicsRow,
+    _ROW_ATTRS,
 )
 from hutch_bunny.core.rquest_models.distribution import DistributionQuery
 
@@ -207,3 +208,31 @@ def test_demographics_row_model_dump() -> None:
     assert result["biobank"] == "test_biobank"
     assert result["category"] == "DEMOGRAPHICS"
     assert result["dataset"] == "person"
+
+
+def test_get_gender_query_reuses_built_query(
+    solver: DemographicsDistributionQuerySolver,
+) -> None:
+    """Test _get_gender_query reuses the query built for the same modifiers."""
+    first = solver._get_gender_query(rounding=10, low_number=5)
+    second = solver._get_gender_query(rounding=10, low_number=5)
+    other = solver._get_gender_query(rounding=0, low_number=5)
+
+    assert first is second
+    assert other is not first
+
+
+def test_build_gender_query_selects_concept_name(
+    solver: DemographicsDistributionQuerySolver,
+) -> None:
+    """Test _build_gender_query fetches the gender concept names with the counts."""
+    stmnt = solver._build_gender_query(rounding=10, low_number=5)
+
+    sql = str(stmnt).lower()
+    assert "concept_name" in sql
+    assert "left outer join concept" in sql
+
+
+def test_row_attrs_match_output_cols() -> None:
+    """Test the TSV row getters line up with the output columns."""
+    assert len(_ROW_ATTRS) == len(DemographicsDistributionQuerySolver.output_cols)
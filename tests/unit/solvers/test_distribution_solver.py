@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import Mock
+
+from hutch_bunny.core.solvers.distribution_solver import CodeDistributionQuerySolver
+from hutch_bunny.core.rquest_models.distribution import DistributionQuery
+
+
+@pytest.fixture
+def solver() -> CodeDistributionQuerySolver:
+    """Create a solver instance with mocked dependencies."""
+    return CodeDistributionQuerySolver(
+        Mock(), Mock(spec=DistributionQuery, collection="test_collection")
+    )
+
+
+def test_get_distribution_query_reuses_built_query(
+    solver: CodeDistributionQuerySolver,
+) -> None:
+    """Test _get_distribution_query reuses the query built for the same domains and modifiers."""
+    # Act
+    first = solver._get_distribution_query(("Condition", "Drug"), 10, 5)
+    second = solver._get_distribution_query(("Condition", "Drug"), 10, 5)
+    other_domains = solver._get_distribution_query(("Condition",), 10, 5)
+    other_modifiers = solver._get_distribution_query(("Condition", "Drug"), 0, 5)
+
+    # Assert
+    assert first is second
+    assert other_domains is not first
+    assert other_modifiers is not first
+    sql_str = str(other_domains.compile(compile_kwargs={"literal_binds": True}))
+    assert "condition_occurrence" in sql_str
+    assert "drug_exposure" not in sql_str
+
+
+def test_row_template_matches_output_cols() -> None:
+    """Test a formatted row has one field per output column, each in its column."""
+    # Act
+    line = CodeDistributionQuerySolver.row_template % (
+        "test_collection",
+        260139,
+        120,
+        260139,
+        "Acute bronchitis",
+        "Condition",
+    )
+
+    # Assert
+    fields = line.split("\t")
+    assert len(fields) == len(CodeDistributionQuerySolver.output_cols)
+    row = dict(zip(CodeDistributionQuerySolver.output_cols, fields))
+    assert row == {
+        "BIOBANK": "test_collection",
+        "CODE": "OMOP:260139",
+        "COUNT": "120",
+        "DESCRIPTION": "",
+        "MIN": "",
+        "Q1": "",
+        "MEDIAN": "",
+        "MEAN": "",
+        "Q3": "",
+        "MAX": "",
+        "ALTERNATIVES": "",
+        "DATASET": "",
+        "OMOP": "260139",
+        "OMOP_DESCR": "Acute bronchitis",
+        "CATEGORY": "Condition",
+    }
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from hutch_bunny.core.db import SyncDBClient
+from hutch_bunny.core.db import SyncDBClient, _check_statement_cache
+from hutch_bunny.core.db.utils import log_query
 
 
 @pytest.fixture
@@ -179,3 +180,65 @@ def test_check_indexes_exist_missing_indexes(
                 # Assert the message contains information about missing indexes
                 warning_msg = mock_logger.warning.call_args[0][0]
                 assert "Missing indexes in the database" in warning_msg
+
+
+@pytest.mark.unit
+def test_check_statement_cache_unsupported_dialect(mock_engine: MagicMock) -> None:
+    """Test that an info message, not a warning, is logged when the dialect disables statement caching."""
+    # Setup
+    mock_engine.dialect.name = "duckdb"
+    mock_engine.dialect.supports_statement_cache = False
+    db_client = MagicMock(engine=mock_engine)
+
+    with patch("hutch_bunny.core.db.logger") as mock_logger:
+        _check_statement_cache(db_client)
+
+        # Assert
+        mock_logger.warning.assert_not_called()
+        mock_logger.info.assert_called_once()
+        assert "duckdb" in mock_logger.info.call_args[0][0]
+
+
+@pytest.mark.unit
+def test_check_statement_cache_supported_dialect(mock_engine: MagicMock) -> None:
+    """Test that nothing is logged when the dialect supports statement caching."""
+    # Setup
+    mock_engine.dialect.supports_statement_cache = True
+    db_client = MagicMock(engine=mock_engine)
+
+    with patch("hutch_bunny.core.db.logger") as mock_logger:
+        _check_statement_cache(db_client)
+
+        # Assert
+        mock_logger.warning.assert_not_called()
+        mock_logger.info.assert_not_called()
+
+
+@pytest.mark.unit
+def test_log_query_logs_at_info(mock_engine: MagicMock) -> None:
+    """Test that the rendered query is logged at INFO."""
+    # Setup
+    stmnt = MagicMock()
+    stmnt.compile.return_value = "SELECT 1"
+
+    with patch("hutch_bunny.core.db.utils.logger") as mock_logger:
+        mock_logger.isEnabledFor.return_value = True
+        log_query(stmnt, mock_engine)
+
+        # Assert
+        mock_logger.info.assert_called_once_with("Executing SQL query:\nSELECT 1")
+
+
+@pytest.mark.unit
+def test_log_query_skips_rendering_when_info_disabled(mock_engine: MagicMock) -> None:
+    """Test that the query is not rendered when INFO logging is disabled."""
+    # Setup
+    stmnt = MagicMock()
+
+    with patch("hutch_bunny.core.db.utils.logger") as mock_logger:
+        mock_logger.isEnabledFor.return_value = False
+        log_query(stmnt, mock_engine)
+
+        # Assert
+        stmnt.compile.assert_not_called()
+        mock_logger.info.assert_not_called()